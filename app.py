@@ -1,8 +1,12 @@
 import streamlit as st
 import os
-import subprocess
 import pandas as pd
 
+from clean_tweets import clean
+from feature_eigineering import main as run_features
+from signals import main as run_signals
+from visualize import visualize
+
 st.set_page_config(page_title="Twitter Trading Signal Analyzer", layout="wide")
 
 st.title("Twitter-Based Trading Signal App")
@@ -16,26 +20,30 @@ if os.path.exists(raw_path):
     #Run Cleaner 
     if st.sidebar.button("Run Cleaning"):
         with st.spinner("Cleaning and normalizing tweets..."):
-            subprocess.run(["python", "clean_tweets.py", raw_path])
+            try:
+                clean()
+            except SystemExit:
+                st.error("Cleaning failed, see logs/cleaning.log")
+                st.stop()
         st.success("Tweets cleaned and saved to 'tweets_cleaned.parquet'")
 
     # Visualize 
     if st.sidebar.button("Visualize Vectors"):
         with st.spinner("Visualizing TF-IDF and embeddings..."):
-            subprocess.run(["python", "visualize.py"])
+            visualize()
         st.image("visualizations/tfidf_pca_plot.png", caption="TF-IDF PCA", use_container_width=True)
         st.image("visualizations/embedding_pca_plot.png", caption="Embeddings PCA", use_container_width=True)
 
     # Feature Engineering 
     if st.sidebar.button("Generate Features"):
         with st.spinner("Running TF-IDF, embeddings, and custom signals..."):
-            subprocess.run(["python", "feature_eigineering.py"])
+            run_features()
         st.success(" Features generated.")
 
     #  Signal Aggregation 
     if st.sidebar.button("Aggregate Signals"):
         with st.spinner("Classifying sentiment and computing composite signals..."):
-            subprocess.run(["python", "signals.py"])
+            run_signals()
 
         signal_df = None
         try:
@@ -45,5 +53,26 @@ if os.path.exists(raw_path):
             st.dataframe(signal_df)
         except Exception as e:
             st.error(f"Failed to load signals: {e}")
+
+    # Full Pipeline (DataFrames are passed between stages in memory)
+    if st.sidebar.button("Run Full Pipeline"):
+        with st.spinner("Cleaning, generating features and aggregating signals..."):
+            try:
+                df = clean(pd.read_parquet(raw_path))
+            except SystemExit:
+                st.error("Cleaning failed, see logs/cleaning.log")
+                st.stop()
+            except Exception as e:
+                st.error(f"Cleaning failed: {e}")
+                st.stop()
+            try:
+                df, _, _ = run_features(df)
+                signal_df = run_signals(df)
+            except Exception as e:
+                st.error(f"Pipeline failed: {e}")
+                st.stop()
+        st.success(f"Pipeline complete: {len(df)} tweets, {len(signal_df)} daily signals.")
+        st.subheader("Daily Signals")
+        st.dataframe(signal_df)
 else:
     st.warning("Please ensure 'data/raw/tweets.parquet' exists.")
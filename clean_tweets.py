@@ -1,69 +1,91 @@
 import pandas as pd
 import re
-import unicodedata
 import emoji
-from langdetect import detect, DetectorFactory
+import fasttext
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from datetime import datetime
 import pytz
 import os
-import logging
 import sys
+from functools import lru_cache
+
+from stage_logging import get_stage_logger
 
 # Setup 
-DetectorFactory.seed = 42
+LANGUAGE_MODEL = "models/lid.176.ftz"
+BATCH_SIZE = 50_000
 os.makedirs("data/cleaned", exist_ok=True)
 
-logging.basicConfig(
-    filename="logs/cleaning.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = get_stage_logger(__name__, "logs/cleaning.log")
+
+# Patterns 
+# INVISIBLE_CHARS and WHITESPACE are RE2 patterns for pyarrow.compute.
+INVISIBLE_CHARS = "[\u200b\u200c\u200d\ufeff\xa0]"
+WHITESPACE = r"[\s\x0b\x1c-\x1f\x85\p{Z}]+"  # RE2 \s is ASCII-only; match Python's Unicode \s
+LIST_SPLIT_RE = re.compile(r",\s*")
+NON_TAG_CHARS_RE = re.compile(r"[^\w@#]")
 
 # Cleaning Functions 
-def normalize_unicode(text):
+def normalize_unicode(texts):
     """
     Normalize invisible Unicode characters and apply NFKC normalization.
 
     Args:
-        text (str): Input text.
+        texts (pa.StringArray): Input texts.
 
     Returns:
-        str: Normalized text.
+        pa.StringArray: Normalized texts.
     """
-    text = unicodedata.normalize("NFKC", text)
-    text = re.sub(r'[\u200b\u200c\u200d\ufeff\xa0]', '', text)  # invisible Unicode
-    return text
+    texts = pc.utf8_normalize(texts, form="NFKC")
+    texts = pc.replace_substring_regex(texts, pattern=INVISIBLE_CHARS, replacement="")  # invisible Unicode
+    return texts
 
-def remove_emojis(text):
+def remove_emojis(texts):
     """
-    Remove all emojis from the given text.
+    Remove all emojis from the given texts.
+
+    Uses emoji.replace_emoji, whose trie lookup is far faster than a
+    regex alternation over every emoji sequence.
 
     Args:
-        text (str): Input text.
+        texts (pa.StringArray): Input texts.
 
     Returns:
-        str: Text without emojis.
+        pa.StringArray: Texts without emojis.
     """
-    return emoji.replace_emoji(text, replace='')
+    return pa.array([emoji.replace_emoji(t, replace='') for t in texts.to_pylist()], type=pa.string())
 
-def clean_text(text):
+def clean_text(texts):
     """
-    Clean text by normalizing, removing newlines, emojis, and extra whitespace.
+    Clean texts by normalizing, removing newlines, emojis, and extra whitespace.
+
+    Plain ASCII rows cannot contain emojis or characters changed by NFKC,
+    so only the non-ASCII rows go through those stages.
 
     Args:
-        text (str): Raw tweet content.
+        texts (pd.Series): Raw tweet content.
 
     Returns:
-        str: Cleaned text.
-    """
-    if pd.isna(text):
-        return ""
-    text = str(text)
-    text = normalize_unicode(text)
-    text = text.replace("\n", " ").replace("\r", "")
-    text = re.sub(r"\s+", " ", text).strip()
-    text = remove_emojis(text)
-    return text
+        pd.Series: Cleaned texts.
+    """
+    arr = pa.array(texts.fillna("").astype(str), type=pa.string())
+    if isinstance(arr, pa.ChunkedArray):  # Arrow-backed columns can span several chunks
+        arr = arr.combine_chunks()
+    non_ascii = pc.invert(pc.string_is_ascii(arr))
+    has_non_ascii = pc.any(non_ascii).as_py()
+
+    if has_non_ascii:
+        arr = pc.replace_with_mask(arr, non_ascii, normalize_unicode(arr.filter(non_ascii)))
+    arr = pc.replace_substring(arr, pattern="\n", replacement=" ")
+    arr = pc.replace_substring(arr, pattern="\r", replacement="")
+    arr = pc.replace_substring_regex(arr, pattern=WHITESPACE, replacement=" ")
+    arr = pc.utf8_trim_whitespace(arr)
+    if has_non_ascii:
+        arr = pc.replace_with_mask(arr, non_ascii, remove_emojis(arr.filter(non_ascii)))
+    return arr.to_pandas().set_axis(texts.index)
 
 def clean_mentions_or_hashtags(field):
     """
@@ -77,43 +99,57 @@ def clean_mentions_or_hashtags(field):
     """
     if pd.isna(field):
         return ""
-    parts = re.split(r",\s*", field)
-    cleaned = [re.sub(r"[^\w@#]", "", p.strip().lower()) for p in parts if p]
+    parts = LIST_SPLIT_RE.split(field)
+    cleaned = [NON_TAG_CHARS_RE.sub("", p.strip().lower()) for p in parts if p]
     return ", ".join(sorted(set(cleaned)))
 
 def parse_timestamp(ts):
     """
-    Convert UTC ISO timestamp to Asia/Kolkata timezone ISO format.
+    Convert UTC ISO timestamps to Asia/Kolkata timezone ISO format.
 
     Args:
-        ts (str): UTC timestamp.
+        ts (pd.Series): UTC timestamps.
 
     Returns:
-        str: IST timestamp or 'N/A' on failure.
+        pd.Series: IST timestamps, 'N/A' where parsing fails.
     """
-    try:
-        dt = pd.to_datetime(ts)
-        if dt.tzinfo is None:
-            dt = dt.tz_localize("UTC")
-        return dt.tz_convert("Asia/Kolkata").isoformat()
-    except Exception as e:
-        return "N/A"
+    dt = pd.to_datetime(ts, utc=True, errors="coerce", format="ISO8601").dt.tz_convert("Asia/Kolkata")
+    micros = dt.dt.microsecond
+    # Match Timestamp.isoformat(): fractional seconds only when non-zero
+    frac = ("." + micros.astype("Int64").astype(str).str.zfill(6)).where(micros > 0, "")
+    offset = dt.dt.strftime("%z").str.replace(r"([+-]\d{2})(\d{2})$", r"\1:\2", regex=True)
+    iso = dt.dt.strftime("%Y-%m-%dT%H:%M:%S") + frac + offset
+    return iso.where(dt.notna(), "N/A")
 
-def is_valid_language(text, allowed=["en", "hi"]):
+@lru_cache(maxsize=1)
+def load_language_model():
     """
-    Check if a tweet is in an allowed language (default: English or Hindi).
+    Load the fastText language identification model once per process.
+
+    Returns:
+        fasttext.FastText._FastText: Loaded model.
+    """
+    logger.info(f"Loading language model: {LANGUAGE_MODEL}")
+    return fasttext.load_model(LANGUAGE_MODEL)
+
+def is_valid_language(texts, allowed=["en", "hi"]):
+    """
+    Check which tweets are in an allowed language (default: English or Hindi)
+    using the fastText lid.176 language identification model.
 
     Args:
-        text (str): Tweet content.
+        texts (pd.Series): Tweet content.
 
     Returns:
-        bool: True if language is allowed, False otherwise.
+        np.ndarray: Boolean mask, True where the language is allowed.
     """
-    try:
-        lang = detect(text)
-        return lang in allowed
-    except:
-        return False
+    model = load_language_model()
+    allowed_labels = {f"__label__{lang}" for lang in allowed}
+
+    # predict() rejects multi-line input; a list is classified in one batched call.
+    texts = texts.str.replace("\n", " ", regex=False).tolist()
+    labels, _ = model.predict(texts, k=1)
+    return np.array([l[0] in allowed_labels for l in labels], dtype=bool)
 
 # DataFrame Cleaner 
 def clean_dataframe(df):
@@ -130,57 +166,77 @@ def clean_dataframe(df):
     Returns:
         pd.DataFrame: Cleaned DataFrame.
     """
-    logging.info("Cleaning DataFrame...")
+    logger.info("Cleaning DataFrame...")
 
     # Clean text fields
     for col in ["username", "timestamp", "content", "mentions", "hashtags"]:
         if col in df.columns:
-            df[col] = df[col].astype(str).apply(clean_text)
+            df[col] = clean_text(df[col].astype(str))
         else:
-            logging.warning(f"Missing column: {col}")
+            logger.warning(f"Missing column: {col}")
 
     df["mentions"] = df["mentions"].apply(clean_mentions_or_hashtags)
     df["hashtags"] = df["hashtags"].apply(clean_mentions_or_hashtags)
 
-    df["timestamp"] = df["timestamp"].apply(parse_timestamp)
+    df["timestamp"] = parse_timestamp(df["timestamp"])
 
     before = len(df)
     df = df[df["content"].str.len() > 5]
     df = df[df["username"] != "N/A"]
-    df = df[df["content"].apply(is_valid_language)]
+    df = df[is_valid_language(df["content"])]
     df = df.drop_duplicates(subset=["username", "timestamp", "content"])
     after = len(df)
 
-    logging.info(f"Cleaned from {before} to {after} rows.")
+    logger.info(f"Cleaned from {before} to {after} rows.")
     return df
 
 # Main 
-def clean():
+def clean(df=None):
     """
-    Load raw tweet data from `data/raw/tweets.parquet`,
-    clean it, and save the result to `data/cleaned/tweets_cleaned.parquet`.
+    Clean raw tweets and save the result to `data/cleaned/tweets_cleaned.parquet`.
+    When `df` is not given, raw data is streamed from `data/raw/tweets.parquet`.
     Logs all steps to `logs/cleaning.log`.
+
+    Args:
+        df (pd.DataFrame, optional): Raw tweets already in memory.
+
+    Returns:
+        pd.DataFrame: Cleaned DataFrame.
     """
     input_file = "data/raw/tweets.parquet"
     output_file = "data/cleaned/tweets_cleaned.parquet"
 
-    if not os.path.exists(input_file):
-        logging.error(f"File not found: {input_file}")
+    if df is None and not os.path.exists(input_file):
+        logger.error(f"File not found: {input_file}")
         print(f"Input file not found: {input_file}")
         sys.exit(1)
 
-    logging.info(f"Loading: {input_file}")
-    print(f"Loading: {input_file}")
-    df = pd.read_parquet(input_file)
-
-    logging.info(f"Cleaning {len(df)} rows...")
-    df_cleaned = clean_dataframe(df)
+    if not os.path.exists(LANGUAGE_MODEL):
+        logger.error(f"Language model not found: {LANGUAGE_MODEL}")
+        print(f"Language model not found: {LANGUAGE_MODEL}")
+        sys.exit(1)
 
-    logging.info(f"Saving cleaned data to {output_file}")
+    if df is None:
+        logger.info(f"Loading: {input_file}")
+        print(f"Loading: {input_file}")
+        parquet_file = pq.ParquetFile(input_file)
+
+        logger.info(f"Cleaning {parquet_file.metadata.num_rows} rows in batches of {BATCH_SIZE}...")
+        df_cleaned = pd.concat(
+            [clean_dataframe(batch.to_pandas()) for batch in parquet_file.iter_batches(batch_size=BATCH_SIZE)],
+            ignore_index=True,
+        )
+        df_cleaned = df_cleaned.drop_duplicates(subset=["username", "timestamp", "content"])
+    else:
+        logger.info(f"Cleaning {len(df)} rows...")
+        df_cleaned = clean_dataframe(df.copy()).reset_index(drop=True)
+
+    logger.info(f"Saving cleaned data to {output_file}")
     df_cleaned.to_parquet(output_file, index=False, engine="pyarrow")
 
     print(f"Cleaned {len(df_cleaned)} rows saved to: {output_file}")
-    logging.info("Cleaning completed.")
+    logger.info("Cleaning completed.")
+    return df_cleaned
 
 if __name__ == "__main__":
     clean()
@@ -2,40 +2,45 @@
 import pandas as pd
 import numpy as np
 import pickle
-import logging
 import os
+import torch
+from functools import lru_cache
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
 from sentence_transformers import SentenceTransformer
 from scipy import sparse
 
+from keyword_scoring import keyword_net_score
+from stage_logging import get_stage_logger
+
 # Configuration 
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = 64
+EMBEDDINGS_FILE = "embeddings/tweet_embeddings.npy"
+TFIDF_FEATURES = 1024
 LOG_FILE = "logs/features.log"
 os.makedirs("features", exist_ok=True)
 os.makedirs("embeddings", exist_ok=True)
 os.makedirs("models", exist_ok=True)
 
 # Setup Logging 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = get_stage_logger(__name__, LOG_FILE)
 
 # Data Loading 
-def load_cleaned_data(file="data/cleaned/tweets_cleaned.parquet") :
+def load_cleaned_data(file="data/cleaned/tweets_cleaned.parquet", columns=None) :
     """
     Load cleaned tweet content from a parquet file.
 
     Args:
         file (str): Path to the cleaned data.
+        columns (list, optional): Columns to read; defaults to all of them.
 
     Returns:
         pd.DataFrame: Loaded dataframe.
     """
-    logging.info(f"Loading cleaned data from {file}")
-    return pd.read_parquet(file)
+    logger.info(f"Loading cleaned data from {file}")
+    return pd.read_parquet(file, columns=columns)
 
 # TF-IDF 
 def save_sparse_matrix(matrix, filepath):
@@ -47,7 +52,7 @@ def save_sparse_matrix(matrix, filepath):
         filepath (str): Output path.
     """
     sparse.save_npz(filepath, matrix)
-    logging.info(f"Saved sparse matrix to {filepath}")
+    logger.info(f"Saved sparse matrix to {filepath}")
 
 def generate_tfidf_vectors(df: pd.DataFrame):
     """
@@ -55,33 +60,81 @@ def generate_tfidf_vectors(df: pd.DataFrame):
 
     Args:
         df (pd.DataFrame): Cleaned tweets.
+
+    Returns:
+        scipy.sparse.csr_matrix: TF-IDF matrix, one row per tweet.
     """
-    logging.info("Generating TF-IDF vectors...")
-    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+    logger.info("Generating TF-IDF vectors...")
+    # Hashing keeps the vocabulary step stateless; only the IDF weights are fitted.
+    vectorizer = make_pipeline(
+        HashingVectorizer(n_features=TFIDF_FEATURES, stop_words='english', alternate_sign=False, norm=None, dtype=np.float32),
+        TfidfTransformer(),
+    )
     tfidf_matrix = vectorizer.fit_transform(df["content"])
 
     save_sparse_matrix(tfidf_matrix, "features/tfidf_vectors.npz")
     with open("features/tfidf_vectorizer.pkl", "wb") as f:
         pickle.dump(vectorizer, f)
-        logging.info("Saved TF-IDF vectorizer to features/tfidf_vectorizer.pkl")
+        logger.info("Saved TF-IDF vectorizer to features/tfidf_vectorizer.pkl")
 
-    logging.info(f"TF-IDF shape: {tfidf_matrix.shape}")
+    logger.info(f"TF-IDF shape: {tfidf_matrix.shape}")
+    return tfidf_matrix
 
 # Embeddings 
+def _detect_device():
+    """
+    Pick the fastest available torch device for the embedding model.
+
+    Returns:
+        str: "cuda", "mps" or "cpu".
+    """
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+@lru_cache(maxsize=1)
+def load_embedding_model():
+    """
+    Load the sentence embedding model once per process, so repeated runs
+    from the Streamlit app reuse the resident model.
+
+    Returns:
+        SentenceTransformer: Model on the detected device.
+    """
+    device = _detect_device()
+    if device == "cpu":
+        torch.set_num_threads(os.cpu_count() or 1)
+    logger.info(f"Loading {EMBEDDING_MODEL} on {device}")
+    return SentenceTransformer(EMBEDDING_MODEL, device=device)
+
 def generate_sentence_embeddings(df: pd.DataFrame):
     """
-    Generate semantic embeddings for tweet content and save them.
+    Generate semantic embeddings for tweet content and save them
+    as a float16 array, one row per tweet in `df` order.
+
+    The `.npy` file has no key column: its rows line up with
+    `data/cleaned/tweets_cleaned.parquet` by position only.
 
     Args:
         df (pd.DataFrame): Cleaned tweets.
-    """
-    logging.info("Generating sentence embeddings")
-    model = SentenceTransformer(EMBEDDING_MODEL)
-    embeddings = df["content"].apply(lambda x: model.encode(x).tolist())
-    df["embedding"] = embeddings
-    df.to_parquet("embeddings/tweets_with_embeddings.parquet", index=False)
 
-    logging.info("Sentence embeddings saved to embeddings/tweets_with_embeddings.parquet")
+    Returns:
+        np.ndarray: Embedding matrix, one row per tweet.
+    """
+    logger.info("Generating sentence embeddings")
+    model = load_embedding_model()
+    embeddings = model.encode(
+        df["content"].tolist(),
+        batch_size=EMBEDDING_BATCH_SIZE,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
+    np.save(EMBEDDINGS_FILE, embeddings.astype(np.float16))
+
+    logger.info(f"Sentence embeddings {embeddings.shape} saved to {EMBEDDINGS_FILE}")
+    return embeddings
 
 # Custom Features
 def generate_custom_features(df: pd.DataFrame):
@@ -90,38 +143,48 @@ def generate_custom_features(df: pd.DataFrame):
 
     Args:
         df (pd.DataFrame): Cleaned tweets.
+
+    Returns:
+        pd.DataFrame: Tweets with a `keyword_score` column.
     """
-    logging.info("Generating custom keyword signals...")
+    logger.info("Generating custom keyword signals...")
 
     buy_keywords = ["buy", "bullish", "long", "breakout", "target"]
     sell_keywords = ["sell", "bearish", "short", "resistance", "fall"]
 
-    def keyword_score(text):
-        text = text.lower()
-        return sum(w in text for w in buy_keywords) - sum(w in text for w in sell_keywords)
-
-    df["keyword_score"] = df["content"].apply(keyword_score)
+    df["keyword_score"] = keyword_net_score(df["content"], buy_keywords, sell_keywords)
     df.to_parquet("features/tweets_with_keywordscore.parquet", index=False)
 
-    logging.info("Saved keyword signals to features/tweets_with_keywordscore.parquet")
+    logger.info("Saved keyword signals to features/tweets_with_keywordscore.parquet")
+    return df
 
 # Pipeline 
-def main():
+def main(df=None):
     """
     Main execution pipeline:
-    - Load cleaned data
+    - Load cleaned data (unless `df` is given)
     - Generate TF-IDF vectors
     - Generate sentence embeddings
     - Add keyword signal features
-    """
-    logging.info("Starting feature engineering ")
-    df = load_cleaned_data()
 
-    generate_tfidf_vectors(df)
-    generate_sentence_embeddings(df)
-    generate_custom_features(df)
+    Args:
+        df (pd.DataFrame, optional): Cleaned tweets already in memory.
 
-    logging.info("Feature engineering complete")
+    Returns:
+        tuple: (tweets with keyword scores, embeddings, TF-IDF matrix)
+    """
+    logger.info("Starting feature engineering ")
+    if df is None:
+        df = load_cleaned_data()
+    else:
+        df = df.copy()
+
+    tfidf_matrix = generate_tfidf_vectors(df)
+    embeddings = generate_sentence_embeddings(df)
+    df = generate_custom_features(df)
+
+    logger.info("Feature engineering complete")
+    return df, embeddings, tfidf_matrix
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,53 @@
+"""
+Keyword Scoring Helpers
+
+Shared by feature engineering and signal aggregation: counts buy/sell
+keyword hits in tweets with a single Aho-Corasick pass per text instead
+of one substring scan per keyword.
+"""
+
+import numpy as np
+import ahocorasick
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def build_keyword_automaton(buy_keywords, sell_keywords):
+    """
+    Build an Aho-Corasick automaton over buy and sell keywords.
+
+    Args:
+        buy_keywords (tuple): Keywords that count +1.
+        sell_keywords (tuple): Keywords that count -1.
+
+    Returns:
+        ahocorasick.Automaton: Automaton whose values are (keyword_index, sign).
+    """
+    automaton = ahocorasick.Automaton()
+    for i, word in enumerate(buy_keywords):
+        automaton.add_word(word, (i, 1))
+    for i, word in enumerate(sell_keywords, start=len(buy_keywords)):
+        automaton.add_word(word, (i, -1))
+    automaton.make_automaton()
+    return automaton
+
+def keyword_net_score(texts, buy_keywords, sell_keywords):
+    """
+    Count distinct buy keywords minus distinct sell keywords in each text
+    (case-insensitive substring match).
+
+    Args:
+        texts (pd.Series): Tweet texts.
+        buy_keywords (list): Buy keywords (lowercase).
+        sell_keywords (list): Sell keywords (lowercase).
+
+    Returns:
+        np.ndarray: Net keyword score per text.
+    """
+    automaton = build_keyword_automaton(tuple(buy_keywords), tuple(sell_keywords))
+
+    def net_score(text):
+        hits = {idx: sign for _, (idx, sign) in automaton.iter(text)}
+        return sum(hits.values())
+
+    lowered = texts.fillna("").str.lower()
+    return np.fromiter((net_score(t) for t in lowered), dtype=np.int8, count=len(lowered))
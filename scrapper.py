@@ -1,8 +1,11 @@
 import asyncio
 from playwright.async_api import async_playwright
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import re
-import hashlib
+import xxhash
 import random
 import logging
 import os
@@ -38,12 +41,24 @@ def parse_count(text):
         return 0
 
 def get_tweet_hash(username, timestamp, content):
-    """Hash a tweet using username, timestamp, and content."""
+    """Hash a tweet using username, timestamp, and content (64-bit xxh3)."""
     base = f"{username}|{timestamp}|{content.strip()}"
-    return hashlib.md5(base.encode()).hexdigest()
+    return xxhash.xxh3_64_intdigest(base.encode())
 
 # Core Scraping
 
+# Extract every visible tweet in one DOM walk so each scroll costs a single
+# browser round-trip instead of several selector calls per tweet.
+EXTRACT_TWEETS_JS = """
+() => Array.from(document.querySelectorAll("article:has(time)")).map(a => ({
+    content: a.innerText,
+    timestamp: a.querySelector("time")?.getAttribute("datetime") ?? null,
+    username: a.querySelector('div[data-testid="User-Name"] span')?.innerText ?? null,
+    likes: a.querySelector('div[data-testid="like"] span')?.innerText ?? null,
+    retweets: a.querySelector('div[data-testid="retweet"] span')?.innerText ?? null,
+}))
+"""
+
 async def scroll_and_collect_tweets(page, tag, seen_hashes, max_tweets=2000, max_scrolls=150):
     """
     Scroll through Twitter search results and collect tweets.
@@ -64,26 +79,19 @@ async def scroll_and_collect_tweets(page, tag, seen_hashes, max_tweets=2000, max
         await page.mouse.wheel(0, 3000)
         await page.wait_for_timeout(1500 + random.randint(200, 600))
 
-        tweet_blocks = await page.query_selector_all("article:has(time)")
+        tweet_blocks = await page.evaluate(EXTRACT_TWEETS_JS)
         logging.info(f"{tag} | Scroll {scroll_num+1}: {len(tweet_blocks)} tweet containers")
 
         for block in tweet_blocks:
             try:
-                content = await block.inner_text()
+                content = block["content"] or ""
                 if not content.strip():
                     continue
 
-                time_tag = await block.query_selector("time")
-                timestamp = await time_tag.get_attribute("datetime") if time_tag else "N/A"
-
-                user_tag = await block.query_selector('div[data-testid="User-Name"] span')
-                username = await user_tag.inner_text() if user_tag else "N/A"
-
-                like_span = await block.query_selector('div[data-testid="like"] span')
-                likes = parse_count(await like_span.inner_text()) if like_span else 0
-
-                retweet_span = await block.query_selector('div[data-testid="retweet"] span')
-                retweets = parse_count(await retweet_span.inner_text()) if retweet_span else 0
+                timestamp = block["timestamp"] or "N/A"
+                username = block["username"] or "N/A"
+                likes = parse_count(block["likes"]) if block["likes"] else 0
+                retweets = parse_count(block["retweets"]) if block["retweets"] else 0
 
                 mentions, hashtags = extract_entities(content)
                 tweet_hash = get_tweet_hash(username, timestamp, content)
@@ -116,9 +124,51 @@ async def scroll_and_collect_tweets(page, tag, seen_hashes, max_tweets=2000, max
 
     return tweets_data
 
+async def scrape_one_tag(browser, storage_file, tag, seen_hashes, max_tweets=2000, max_scrolls=150):
+    """
+    Scrape a single hashtag in its own browser context.
+
+    Args:
+        browser: Playwright browser instance
+        storage_file: Logged-in browser storage state file
+        tag: Hashtag string (e.g., "#nifty50")
+        seen_hashes: Set of tweet hashes shared across tags
+        max_tweets: Max tweets to collect for this tag
+        max_scrolls: Max scroll iterations
+
+    Returns:
+        List of tweet dictionaries (empty on error)
+    """
+    context = None
+    try:
+        context = await browser.new_context(storage_state=storage_file)
+        page = await context.new_page()
+
+        logging.info(f"Searching: {tag}")
+        query = tag.replace("#", "%23")
+        url = f"https://twitter.com/search?q={query}&src=typed_query&f=live"
+
+        await page.goto(url, timeout=60000)
+        await page.wait_for_timeout(5000)
+
+        return await scroll_and_collect_tweets(page, tag, seen_hashes, max_tweets, max_scrolls)
+    except Exception as e:
+        logging.error(f"Error scraping {tag}: {e}")
+        return []
+    finally:
+        if context is not None:
+            try:
+                await context.close()
+            except Exception as e:
+                logging.warning(f"Failed to close context for {tag}: {e}")
+
 async def scrape_multiple_tags(storage_file="twitter_storage.json", tags=["#nifty50", "#banknifty"], max_tweets=2000, max_scrolls=150):
     """
-    Scrape multiple Twitter hashtags and save results.
+    Scrape multiple Twitter hashtags concurrently and save results.
+
+    Each tag gets its own browser context. The contexts share one
+    seen-hash set; the check-and-add in scroll_and_collect_tweets has no
+    await in between, so no lock is needed on the event loop.
 
     Args:
         storage_file: Logged-in browser storage state file
@@ -126,28 +176,23 @@ async def scrape_multiple_tags(storage_file="twitter_storage.json", tags=["#nift
         max_tweets: Max tweets per tag
         max_scrolls: Max scroll iterations per tag
     """
-    all_data = []
     seen_hashes = set()
     os.makedirs("data", exist_ok=True)
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context(storage_state=storage_file)
-        page = await context.new_page()
 
-        for tag in tags:
-            try:
-                logging.info(f"Searching: {tag}")
-                query = tag.replace("#", "%23")
-                url = f"https://twitter.com/search?q={query}&src=typed_query&f=live"
+        results = await asyncio.gather(*[
+            scrape_one_tag(browser, storage_file, tag, seen_hashes, max_tweets, max_scrolls)
+            for tag in tags
+        ], return_exceptions=True)
 
-                await page.goto(url, timeout=60000)
-                await page.wait_for_timeout(5000)
-
-                tag_data = await scroll_and_collect_tweets(page, tag, seen_hashes, max_tweets, max_scrolls)
-                all_data.extend(tag_data)
-            except Exception as e:
-                logging.error(f"Error scraping {tag}: {e}")
+        all_data = []
+        for tag, tag_data in zip(tags, results):
+            if isinstance(tag_data, BaseException):
+                logging.error(f"Error scraping {tag}: {tag_data}")
+                continue
+            all_data.extend(tag_data)
 
         await browser.close()
 
@@ -157,14 +202,16 @@ async def scrape_multiple_tags(storage_file="twitter_storage.json", tags=["#nift
     else:
         df = pd.DataFrame(all_data)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        csv_path = f"data/raw/tweets_{timestamp}.csv"
         parquet_path = f"data/raw/tweets_{timestamp}.parquet"
 
-        df.to_csv(csv_path, index=False, encoding='utf-8')
-        df.to_parquet(parquet_path, index=False, engine="pyarrow")
+        # hashtag/username repeat heavily, so store them dictionary-encoded
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for col in ["hashtag", "username"]:
+            table = table.set_column(table.schema.get_field_index(col), col, pc.dictionary_encode(table[col]))
+        pq.write_table(table, parquet_path, compression="zstd", use_dictionary=True)
 
-        logging.info(f"Saved {len(df)} tweets to CSV and Parquet.")
-        print(f"\n Saved {len(df)} tweets to:\n- {csv_path}\n- {parquet_path}")
+        logging.info(f"Saved {len(df)} tweets to Parquet.")
+        print(f"\n Saved {len(df)} tweets to:\n- {parquet_path}")
 
 if __name__ == "__main__":
     asyncio.run(scrape_multiple_tags())
@@ -9,126 +9,146 @@ Date: 2025-08-03
 """
 
 import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+from keyword_scoring import keyword_net_score
+from stage_logging import get_stage_logger
 import os
-import logging
 
 # Logging 
 
 os.makedirs("signals", exist_ok=True)
 
-logging.basicConfig(
-    filename="logs/signals.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = get_stage_logger(__name__, "logs/signals.log")
+
+BATCH_SIZE = 50_000
+INPUT_COLUMNS = ["content", "timestamp", "keyword_score"]
 
 # Signal Rules
 buy_threshold = 0.65
 sell_threshold = 0.35
 
-def classify_sentiment(text) :
+def classify_sentiment(texts) :
     """
     Classify sentiment of tweet content as 'buy', 'sell', or 'neutral'.
 
     Args:
-        text (str): Tweet text.
+        texts (pd.Series): Tweet texts.
 
     Returns:
-        str: Sentiment category.
+        np.ndarray: Sentiment category for each tweet.
     """
     buy_keywords = ["buy", "bullish", "long", "breakout", "target", "support"]
     sell_keywords = ["sell", "bearish", "short", "resistance", "fall", "downside"]
 
-    text = text.lower()
-    buy_score = sum(word in text for word in buy_keywords)
-    sell_score = sum(word in text for word in sell_keywords)
+    score = keyword_net_score(texts, buy_keywords, sell_keywords)
 
-    if buy_score > sell_score:
-        return "buy"
-    elif sell_score > buy_score:
-        return "sell"
-    else:
-        return "neutral"
+    return np.where(score > 0, "buy", np.where(score < 0, "sell", "neutral"))
 
-def compute_aggregated_signals(group) :
+def compute_aggregated_signals(df) :
     """
     Aggregate tweet-level signals into daily metrics and compute a composite signal.
 
     Args:
-        group (pd.DataFrame): Tweets for one day.
+        df (pd.DataFrame): Tweets with `date`, `sentiment` and `keyword_score` columns.
 
     Returns:
-        pd.Series: Aggregated metrics and final signal.
+        pd.DataFrame: Aggregated metrics and final signal, one row per day.
     """
-    total = len(group)
-    if total == 0:
-        return pd.Series({
-            "tweet_volume": 0,
-            "buy_pct": 0,
-            "sell_pct": 0,
-            "neutral_pct": 0,
-            "avg_keyword_score": 0,
-            "composite_score": 0,
-            "signal": "neutral",
-            "confidence_pct": 0
-        })
-
-    buy = (group['sentiment'] == 'buy').sum()
-    sell = (group['sentiment'] == 'sell').sum()
-    neutral = (group['sentiment'] == 'neutral').sum()
-
-    buy_pct = buy / total
-    sell_pct = sell / total
-    neutral_pct = neutral / total
-    avg_keyword = group["keyword_score"].mean()
+    df = df.assign(
+        is_buy=df["sentiment"].eq("buy").astype(np.int8),
+        is_sell=df["sentiment"].eq("sell").astype(np.int8),
+        is_neutral=df["sentiment"].eq("neutral").astype(np.int8),
+    )
+    g = df.groupby("date").agg(
+        tweet_volume=("sentiment", "size"),
+        buy=("is_buy", "sum"),
+        sell=("is_sell", "sum"),
+        neutral=("is_neutral", "sum"),
+        avg_keyword_score=("keyword_score", "mean"),
+    )
+
+    total = g["tweet_volume"]
+    buy_pct = g["buy"] / total
+    sell_pct = g["sell"] / total
+    neutral_pct = g["neutral"] / total
 
     # Weighted signal scoring
-    score = 0.5 * buy_pct + 0.3 * (avg_keyword / 5) + 0.2 * min(total / 500, 1.0)
-    signal = "buy" if score > buy_threshold else "sell" if score < sell_threshold else "neutral"
-    confidence = round(score * 100, 1)
+    score = 0.5 * buy_pct + 0.3 * (g["avg_keyword_score"] / 5) + 0.2 * np.minimum(total / 500, 1.0)
+    signal = np.where(score > buy_threshold, "buy", np.where(score < sell_threshold, "sell", "neutral"))
 
-    return pd.Series({
+    return pd.DataFrame({
         "tweet_volume": total,
-        "buy_pct": round(buy_pct, 3),
-        "sell_pct": round(sell_pct, 3),
-        "neutral_pct": round(neutral_pct, 3),
-        "avg_keyword_score": round(avg_keyword, 2),
-        "composite_score": round(score, 3),
+        "buy_pct": buy_pct.round(3),
+        "sell_pct": sell_pct.round(3),
+        "neutral_pct": neutral_pct.round(3),
+        "avg_keyword_score": g["avg_keyword_score"].round(2),
+        "composite_score": score.round(3),
         "signal": signal,
-        "confidence_pct": confidence
-    })
+        "confidence_pct": (score * 100).round(1)
+    }, index=g.index)
 
 # Aggregation  
-def main():
+def prepare_tweets(df) :
     """
-    Load tweets with keyword scores, classify sentiment, and aggregate daily signals.
-    Saves the result to a Parquet file and logs the pipeline.
+    Parse tweet dates and classify sentiment.
+
+    Args:
+        df (pd.DataFrame): Tweets with `content`, `timestamp` and `keyword_score`.
+
+    Returns:
+        pd.DataFrame: `date`, `sentiment` and `keyword_score` for tweets with a valid timestamp.
     """
-    input_file = "features/tweets_with_keywordscore.parquet"
-    output_file = "signals/daily_aggregated_signals.csv"
+    dt = pd.to_datetime(df["timestamp"], errors="coerce")
+    df = df[dt.notna()]
+    return pd.DataFrame({
+        "date": dt[dt.notna()].dt.date,
+        "sentiment": classify_sentiment(df["content"]),
+        "keyword_score": df["keyword_score"],
+    })
 
-    if not os.path.exists(input_file):
-        logging.error(f"Input file not found: {input_file}")
-        print(f"File missing: {input_file}")
-        return
+def main(df=None):
+    """
+    Load tweets with keyword scores (unless `df` is given), classify sentiment,
+    and aggregate daily signals. Saves the result to a CSV file and logs the pipeline.
 
-    logging.info(f"Loading: {input_file}")
-    df = pd.read_parquet(input_file)
+    Args:
+        df (pd.DataFrame, optional): Tweets with keyword scores already in memory.
 
-    logging.info(f"Classifying sentiment for {len(df)} tweets")
-    df["datetime"] = pd.to_datetime(df["timestamp"], errors="coerce")
-    df = df[df["datetime"].notna()]
-    df["date"] = df["datetime"].dt.date
-    df["sentiment"] = df["content"].apply(classify_sentiment)
+    Returns:
+        pd.DataFrame: Daily aggregated signals, or None if the input file is missing.
+    """
+    input_file = "features/tweets_with_keywordscore.parquet"
+    output_file = "signals/daily_aggregated_signals.csv"
+
+    if df is None:
+        if not os.path.exists(input_file):
+            logger.error(f"Input file not found: {input_file}")
+            print(f"File missing: {input_file}")
+            return None
+
+        logger.info(f"Loading: {input_file}")
+        parquet_file = pq.ParquetFile(input_file)
+
+        logger.info(f"Classifying sentiment for {parquet_file.metadata.num_rows} tweets")
+        df = pd.concat(
+            [prepare_tweets(batch.to_pandas())
+             for batch in parquet_file.iter_batches(batch_size=BATCH_SIZE, columns=INPUT_COLUMNS)],
+            ignore_index=True,
+        )
+    else:
+        logger.info(f"Classifying sentiment for {len(df)} tweets")
+        df = prepare_tweets(df)
 
-    logging.info("Aggregating by date")
-    aggregated = df.groupby("date").apply(compute_aggregated_signals).reset_index()
+    logger.info("Aggregating by date")
+    aggregated = compute_aggregated_signals(df).reset_index()
 
-    logging.info(f"Saving aggregated output to {output_file}")
+    logger.info(f"Saving aggregated output to {output_file}")
     aggregated.to_csv(output_file, index=False)
 
     print(f"Saved {len(aggregated)} daily signals to: {output_file}")
-    logging.info("Signal aggregation complete.")
+    logger.info("Signal aggregation complete.")
+    return aggregated
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,32 @@
+"""
+Stage Logging Helper
+
+Each pipeline stage writes to its own file under logs/. The stages are
+also imported together by app.py, where a per-module basicConfig call
+would only honour the first import, so each stage gets a named logger
+with its own file handler instead.
+"""
+
+import logging
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+def get_stage_logger(name, path):
+    """
+    Return a logger that writes INFO and above to `path`.
+
+    Args:
+        name (str): Logger name, usually the module's `__name__`.
+        path (str): Log file for this stage.
+
+    Returns:
+        logging.Logger: Configured logger (handlers are added only once).
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
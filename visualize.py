@@ -1,39 +1,37 @@
 
 
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import logging
 import os
 
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, TruncatedSVD
 from sklearn.preprocessing import normalize
 from scipy import sparse
 
+from feature_eigineering import EMBEDDINGS_FILE
+from stage_logging import get_stage_logger
+
 
 #  Setup 
 
 os.makedirs("visualizations", exist_ok=True)
 
-logging.basicConfig(
-    filename="logs/visualization.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+logger = get_stage_logger(__name__, "logs/visualization.log")
 
 # TF-IDF Visualization 
 def visualize_tfidf_pca():
     """
-    Loads TF-IDF vectors, normalizes them, reduces dimensionality via PCA,
-    and plots a 2D scatter plot.
+    Loads TF-IDF vectors, normalizes them, reduces dimensionality via
+    TruncatedSVD on the sparse matrix, and plots a 2D scatter plot.
     """
     try:
-        logging.info("Loading TF-IDF matrix")
-        tfidf = sparse.load_npz("features/tfidf_vectors.npz")
+        logger.info("Loading TF-IDF matrix")
+        tfidf = sparse.load_npz("features/tfidf_vectors.npz").astype(np.float32)
         tfidf_norm = normalize(tfidf, norm='l2')
 
-        logging.info("🧪 Running PCA on TF-IDF")
-        reduced = PCA(n_components=2).fit_transform(tfidf_norm[:3000].toarray())
+        logger.info("🧪 Running TruncatedSVD on TF-IDF")
+        svd = TruncatedSVD(n_components=2, algorithm="randomized", n_iter=4, random_state=0)
+        reduced = svd.fit_transform(tfidf_norm[:3000])
 
         plt.figure(figsize=(10, 6))
         plt.scatter(reduced[:, 0], reduced[:, 1], s=5, alpha=0.4)
@@ -42,11 +40,12 @@ def visualize_tfidf_pca():
         plt.tight_layout()
 
         plt.savefig("visualizations/tfidf_pca_plot.png")
-        logging.info("Saved TF-IDF plot to visualizations/tfidf_pca_plot.png")
+        plt.close()
+        logger.info("Saved TF-IDF plot to visualizations/tfidf_pca_plot.png")
         
 
     except Exception as e:
-        logging.error(f"TF-IDF visualization failed: {e}")
+        logger.error(f"TF-IDF visualization failed: {e}")
         print("TF-IDF visualization error:", e)
 
 # Embedding Visualization 
@@ -56,12 +55,11 @@ def visualize_embeddings_pca():
     and plots a scatter plot.
     """
     try:
-        logging.info("Loading sentence embeddings")
-        df = pd.read_parquet("embeddings/tweets_with_embeddings.parquet")
-        emb = np.array(df["embedding"].to_list())
+        logger.info("Loading sentence embeddings")
+        emb = np.load(EMBEDDINGS_FILE).astype(np.float32)
 
-        logging.info("Running PCA on embeddings")
-        reduced = PCA(n_components=2).fit_transform(emb)
+        logger.info("Running PCA on embeddings")
+        reduced = PCA(n_components=2, svd_solver="randomized", random_state=0).fit_transform(emb)
 
         plt.figure(figsize=(10, 6))
         plt.scatter(reduced[:, 0], reduced[:, 1], s=5, alpha=0.4)
@@ -69,11 +67,12 @@ def visualize_embeddings_pca():
         plt.grid(True)
         plt.tight_layout()
         plt.savefig("visualizations/embedding_pca_plot.png")
-        logging.info("Saved embeddings plot to visualizations/embedding_pca_plot.png")
+        plt.close()
+        logger.info("Saved embeddings plot to visualizations/embedding_pca_plot.png")
         
 
     except Exception as e:
-        logging.error(f"Embedding visualization failed: {e}")
+        logger.error(f"Embedding visualization failed: {e}")
         print("Embedding visualization error:", e)
 
 
@@ -84,10 +83,10 @@ def visualize():
     - TF-IDF sparse vectors
     - Sentence transformer embeddings
     """
-    logging.info("Starting visualization pipeline")
+    logger.info("Starting visualization pipeline")
     visualize_tfidf_pca()
     visualize_embeddings_pca()
-    logging.info(" Visualization complete")
+    logger.info(" Visualization complete")
 
 if __name__ == "__main__":
     visualize()